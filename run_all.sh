@@ -6,7 +6,8 @@ NC='\033[0m' # Sem cor
 
 echo "Iniciando a geração do relatório final..."
 
-# Converte o notebook final para HTML, colocando-o na pasta de outputs
-jupyter nbconvert --to html --execute notebooks/05_final_report_for_recruiter.ipynb --output-dir=outputs/
+# Monta o HTML a partir do notebook final, das figuras salvas e das tabelas de KPI em cache.
+# Apenas as seções cujas entradas mudaram são renderizadas novamente (use --force para refazer tudo).
+python scripts/build_report.py "$@" || exit 1
 
-echo -e "${GREEN}Relatório '05_final_report_for_recruiter.html' gerado com sucesso na pasta /outputs!${NC}"
\ No newline at end of file
+echo -e "${GREEN}Relatório '05_final_report.html' gerado com sucesso na pasta /outputs!${NC}"
@@ -0,0 +1,26 @@
+# scripts/build_report.py
+
+import argparse
+import sys
+from pathlib import Path
+
+# Allows importing the 'src' package when the script is run from any folder
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.report import build_report
+
+
+def main():
+    """
+    Generates outputs/05_final_report.html from the final report notebook,
+    the saved figures and the cached KPI tables, without running Jupyter.
+    """
+    parser = argparse.ArgumentParser(description="Builds the final HTML report.")
+    parser.add_argument("--force", action="store_true", help="Re-render every section, ignoring the cache.")
+    args = parser.parse_args()
+
+    build_report(force=args.force)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,332 @@
 # scripts/download_data.py
 
+import argparse
+import hashlib
+import json
 import os
+import shutil
 import subprocess
+import sys
+import urllib.request
+import zipfile
+from pathlib import Path
 
-def download_and_unzip_kaggle_dataset():
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RAW_DIR = PROJECT_ROOT / 'data' / 'raw'
+ARCHIVE_DIR = PROJECT_ROOT / 'data' / 'archives'
+MANIFEST_PATH = Path(__file__).resolve().parent / 'olist_checksums.json'
+# Registro local das conversões já feitas (CRC/tamanho do membro no zip + sha256 do CSV)
+CONVERTED_PATH = RAW_DIR / '_converted.json'
+
+KAGGLE_DATASET = 'olistbr/brazilian-ecommerce'
+ARCHIVE_NAME = 'brazilian-ecommerce.zip'
+
+# Tamanho de cada bloco lido do CSV; limita a memória usada na conversão
+BLOCK_SIZE = 8 << 20
+# Tempo máximo (em segundos) de espera por uma resposta do mirror
+MIRROR_TIMEOUT = 60
+
+# Tipos das colunas de cada arquivo. Colunas não listadas são inferidas pelo pyarrow.
+# Os ids ficam como texto, as datas como timestamp, e as colunas numéricas com valores
+# ausentes como float64, igual ao que o pandas.read_csv produzia.
+_TIMESTAMP = pa.timestamp('s')
+COLUMN_TYPES = {
+    'olist_customers_dataset.csv': {
+        'customer_id': pa.string(), 'customer_unique_id': pa.string(),
+        'customer_zip_code_prefix': pa.int64(), 'customer_city': pa.string(), 'customer_state': pa.string(),
+    },
+    'olist_geolocation_dataset.csv': {
+        'geolocation_zip_code_prefix': pa.int64(), 'geolocation_lat': pa.float64(), 'geolocation_lng': pa.float64(),
+        'geolocation_city': pa.string(), 'geolocation_state': pa.string(),
+    },
+    'olist_orders_dataset.csv': {
+        'order_id': pa.string(), 'customer_id': pa.string(), 'order_status': pa.string(),
+        'order_purchase_timestamp': _TIMESTAMP, 'order_approved_at': _TIMESTAMP,
+        'order_delivered_carrier_date': _TIMESTAMP, 'order_delivered_customer_date': _TIMESTAMP,
+        'order_estimated_delivery_date': _TIMESTAMP,
+    },
+    'olist_order_items_dataset.csv': {
+        'order_id': pa.string(), 'order_item_id': pa.int64(), 'product_id': pa.string(), 'seller_id': pa.string(),
+        'shipping_limit_date': _TIMESTAMP, 'price': pa.float64(), 'freight_value': pa.float64(),
+    },
+    'olist_order_payments_dataset.csv': {
+        'order_id': pa.string(), 'payment_sequential': pa.int64(), 'payment_type': pa.string(),
+        'payment_installments': pa.int64(), 'payment_value': pa.float64(),
+    },
+    'olist_order_reviews_dataset.csv': {
+        'review_id': pa.string(), 'order_id': pa.string(), 'review_score': pa.int64(),
+        'review_comment_title': pa.string(), 'review_comment_message': pa.string(),
+        'review_creation_date': _TIMESTAMP, 'review_answer_timestamp': _TIMESTAMP,
+    },
+    'olist_products_dataset.csv': {
+        'product_id': pa.string(), 'product_category_name': pa.string(),
+        'product_name_lenght': pa.float64(), 'product_description_lenght': pa.float64(),
+        'product_photos_qty': pa.float64(), 'product_weight_g': pa.float64(), 'product_length_cm': pa.float64(),
+        'product_height_cm': pa.float64(), 'product_width_cm': pa.float64(),
+    },
+    'olist_sellers_dataset.csv': {
+        'seller_id': pa.string(), 'seller_zip_code_prefix': pa.int64(),
+        'seller_city': pa.string(), 'seller_state': pa.string(),
+    },
+    'product_category_name_translation.csv': {
+        'product_category_name': pa.string(), 'product_category_name_english': pa.string(),
+    },
+}
+
+
+class ChecksumError(Exception):
+    """O sha256 de um arquivo não corresponde ao manifesto."""
+
+
+class _HashingReader:
+    """Envolve um arquivo binário e calcula o sha256 de tudo que é lido dele."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.sha256 = hashlib.sha256()
+        self.closed = False
+
+    def read(self, size=-1):
+        chunk = self.raw.read(size)
+        self.sha256.update(chunk)
+        return chunk
+
+    def readable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        """Lê o restante do arquivo, para que o hash cubra o membro inteiro."""
+        for chunk in iter(lambda: self.read(1 << 20), b''):
+            pass
+        return self.sha256.hexdigest()
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_json(path: Path) -> dict:
+    return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+
+def _write_json(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def download_from_kaggle(destination: Path = ARCHIVE_DIR) -> Path:
     """
-    Baixa e descompacta o dataset Olist do Kaggle.
-    
+    Baixa o arquivo .zip do dataset Olist pelo Kaggle, sem descompactá-lo.
+
     Certifique-se de que a API do Kaggle está configurada com o token
-    no diretório ~/.kaggle/kaggle.json.
-    """
-    dataset = 'olistbr/brazilian-ecommerce'
-    destination_folder = 'data/raw'
-    
-    # Cria a pasta de destino se ela não existir
-    os.makedirs(destination_folder, exist_ok=True)
-    
-    print(f"Baixando o dataset '{dataset}' para a pasta '{destination_folder}'...")
-    
-    # Constrói o comando do Kaggle API
-    command = [
-        'kaggle', 'datasets', 'download',
-        '-d', dataset,
-        '-p', destination_folder,
-        '--unzip'
-    ]
-    
+    no diretório ~/.kaggle/kaggle.json. O Kaggle não baixa o arquivo de novo
+    se a cópia local já estiver atualizada.
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    print(f"Baixando o dataset '{KAGGLE_DATASET}' para a pasta '{destination}'...")
+
+    command = ['kaggle', 'datasets', 'download', '-d', KAGGLE_DATASET, '-p', str(destination)]
     try:
-        # Executa o comando
         subprocess.run(command, check=True, capture_output=True, text=True)
-        print("Download e descompressão concluídos com sucesso!")
-        
     except FileNotFoundError:
-        print("Erro: O comando 'kaggle' não foi encontrado.")
-        print("Certifique-se de que a biblioteca do Kaggle está instalada ('pip install kaggle') e que o executável está no seu PATH.")
-        
+        sys.exit("Erro: O comando 'kaggle' não foi encontrado.\n"
+                 "Certifique-se de que a biblioteca do Kaggle está instalada ('pip install kaggle') "
+                 "e que o executável está no seu PATH.")
     except subprocess.CalledProcessError as e:
-        print(f"Erro ao executar o comando do Kaggle: {e}")
-        print("Verifique se suas credenciais da API do Kaggle estão corretas em ~/.kaggle/kaggle.json.")
-        print(f"Stderr: {e.stderr}")
+        sys.exit(f"Erro ao executar o comando do Kaggle: {e}\n"
+                 "Verifique se suas credenciais da API do Kaggle estão corretas em ~/.kaggle/kaggle.json.\n"
+                 f"Stderr: {e.stderr}")
+    return destination / ARCHIVE_NAME
+
+
+def download_from_mirror(url: str, destination: Path = ARCHIVE_DIR, force: bool = False,
+                         timeout: float = MIRROR_TIMEOUT) -> Path:
+    """
+    Baixa o arquivo .zip de um mirror HTTP(S) em blocos, sem carregá-lo inteiro na memória.
+
+    O download é gravado em um arquivo temporário e só é renomeado ao terminar, então
+    um download interrompido nunca é confundido com um arquivo completo. Um mirror que
+    fica mais de `timeout` segundos sem responder interrompe o download com erro.
+    """
+    destination.mkdir(parents=True, exist_ok=True)
+    archive_path = destination / ARCHIVE_NAME
+    if archive_path.exists() and not force:
+        print(f"Arquivo '{archive_path}' já existe; download ignorado (use --force para baixar de novo).")
+        return archive_path
+
+    print(f"Baixando '{url}' para '{archive_path}'...")
+    tmp_path = archive_path.with_suffix('.zip.part')
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response, open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(response, f, length=1 << 20)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, archive_path)
+    return archive_path
+
+
+def _convert_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, output_path: Path,
+                    expected: str = None) -> str:
+    """
+    Converte um CSV do .zip para parquet em streaming e retorna o sha256 do CSV.
+
+    O membro é descompactado e lido em blocos de BLOCK_SIZE, e cada bloco é gravado
+    como um row group do parquet, então a memória usada não depende do tamanho do arquivo.
+    A conversão é feita em um arquivo temporário, que só substitui o parquet existente
+    depois que o sha256 confere com `expected`. Se não conferir, o parquet anterior
+    (já verificado) é mantido e ChecksumError é lançado.
+    """
+    read_options = pacsv.ReadOptions(block_size=BLOCK_SIZE)
+    # Os comentários das avaliações têm quebras de linha dentro das aspas
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    convert_options = pacsv.ConvertOptions(
+        column_types=COLUMN_TYPES.get(Path(info.filename).name, {}),
+        strings_can_be_null=True,
+        timestamp_parsers=['%Y-%m-%d %H:%M:%S', '%Y-%m-%d'],
+    )
+
+    tmp_path = output_path.with_suffix('.parquet.tmp')
+    try:
+        with archive.open(info) as member:
+            source = _HashingReader(member)
+            reader = pacsv.open_csv(source, read_options=read_options,
+                                    parse_options=parse_options, convert_options=convert_options)
+            with pq.ParquetWriter(tmp_path, reader.schema, compression='snappy') as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+            sha256 = source.drain()
+        if expected is not None and sha256 != expected:
+            raise ChecksumError(f"O sha256 de '{info.filename}' ({sha256}) não corresponde ao manifesto ({expected}).")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, output_path)
+    return sha256
+
+
+def convert_archive(archive_path: Path, raw_dir: Path = RAW_DIR, manifest_path: Path = MANIFEST_PATH,
+                    write_manifest: bool = False, force: bool = False) -> dict:
+    """
+    Verifica e converte cada CSV do .zip para um parquet tipado em data/raw.
+
+    Um membro é ignorado quando o CRC32 e o tamanho no .zip são os mesmos da última
+    conversão, o parquet ainda existe e o sha256 registrado bate com o manifesto.
+    Nesses casos nada é descompactado.
+
+    Args:
+        archive_path (Path): Caminho do .zip do dataset.
+        raw_dir (Path): Pasta onde os parquets são gravados.
+        manifest_path (Path): Manifesto com o sha256 esperado de cada CSV (e do .zip, se houver).
+        write_manifest (bool): Grava o manifesto a partir deste arquivo em vez de verificá-lo.
+        force (bool): Converte todos os membros, ignorando o registro de conversões.
+
+    Returns:
+        dict: Nome do CSV -> 'converted' ou 'skipped'.
+    """
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {} if write_manifest else _load_json(manifest_path)
+    if not manifest and not write_manifest:
+        print(f"Aviso: manifesto '{manifest_path}' não encontrado; os checksums não serão verificados. "
+              "Use --write-manifest com um arquivo confiável para criá-lo.")
+
+    expected_archive = manifest.get('archive', {}).get(archive_path.name)
+    archive_sha256 = None
+    if expected_archive or write_manifest:
+        archive_sha256 = _file_sha256(archive_path)
+        if expected_archive and archive_sha256 != expected_archive:
+            raise ChecksumError(f"O sha256 de '{archive_path}' ({archive_sha256}) não corresponde ao manifesto.")
+
+    # O registro é sempre carregado; --force só desativa a verificação abaixo, para que um
+    # checksum errado não apague os registros dos membros já verificados
+    converted = _load_json(raw_dir / CONVERTED_PATH.name)
+    expected_members = manifest.get('members', {})
+    new_manifest = {'archive': {archive_path.name: archive_sha256}, 'members': {}}
+    status = {}
+
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            name = Path(info.filename).name
+            if info.is_dir() or not name.endswith('.csv'):
+                continue
+            output_path = raw_dir / name.replace('.csv', '.parquet')
+            expected = expected_members.get(name)
+            previous = converted.get(name)
+
+            up_to_date = (
+                previous is not None
+                and previous['crc32'] == info.CRC and previous['size'] == info.file_size
+                and (expected is None or previous['sha256'] == expected)
+                and output_path.exists()
+            )
+            if up_to_date and not (write_manifest or force):
+                print(f"  - '{name}' sem alterações; conversão ignorada.")
+                new_manifest['members'][name] = previous['sha256']
+                status[name] = 'skipped'
+                continue
+
+            print(f"  - Convertendo '{name}' -> '{output_path.name}'...")
+            # Em caso de checksum errado, o parquet e o registro anteriores ficam intactos
+            sha256 = _convert_member(archive, info, output_path, expected=expected)
+
+            converted[name] = {'crc32': info.CRC, 'size': info.file_size, 'sha256': sha256}
+            # Registra a cada membro, para que uma execução interrompida não perca o progresso
+            _write_json(raw_dir / CONVERTED_PATH.name, converted)
+            new_manifest['members'][name] = sha256
+            status[name] = 'converted'
+
+    missing = sorted(set(expected_members) - set(status))
+    if missing:
+        raise ChecksumError(f"Arquivos do manifesto ausentes no .zip: {', '.join(missing)}")
+
+    if write_manifest:
+        _write_json(manifest_path, new_manifest)
+        print(f"Manifesto gravado em '{manifest_path}'.")
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baixa o dataset Olist e converte os CSVs para parquet.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--archive', type=Path, help="Usa um .zip local em vez de baixar do Kaggle.")
+    source.add_argument('--mirror', help="Baixa o .zip desta URL em vez do Kaggle.")
+    parser.add_argument('--manifest', type=Path, default=MANIFEST_PATH, help="Manifesto de checksums.")
+    parser.add_argument('--write-manifest', action='store_true',
+                        help="Grava o manifesto a partir do .zip atual (use apenas com um arquivo confiável).")
+    parser.add_argument('--timeout', type=float, default=MIRROR_TIMEOUT,
+                        help="Segundos de espera por resposta do mirror antes de desistir.")
+    parser.add_argument('--force', action='store_true', help="Baixa e converte tudo de novo.")
+    args = parser.parse_args()
+
+    if args.archive:
+        archive_path = args.archive
+    elif args.mirror:
+        archive_path = download_from_mirror(args.mirror, force=args.force, timeout=args.timeout)
+    else:
+        archive_path = download_from_kaggle()
+
+    try:
+        status = convert_archive(archive_path, manifest_path=args.manifest,
+                                 write_manifest=args.write_manifest, force=args.force)
+    except ChecksumError as e:
+        sys.exit(f"Erro de integridade: {e}")
+
+    converted = sum(1 for s in status.values() if s == 'converted')
+    print(f"Concluído: {converted} arquivo(s) convertido(s), {len(status) - converted} sem alterações.")
+
 
 if __name__ == '__main__':
-    download_and_unzip_kaggle_dataset()
\ No newline at end of file
+    main()
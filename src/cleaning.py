@@ -1,6 +1,9 @@
 # src/cleaning.py
 import pandas as pd
 
+from .instrumentation import instrument
+
+@instrument()
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Performs initial data cleaning on the merged dataframe.
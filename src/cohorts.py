@@ -0,0 +1,295 @@
+# src/cohorts.py
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .instrumentation import instrument
+
+CUSTOMER_COL = 'customer_unique_id'
+ORDER_COL = 'order_id'
+TIMESTAMP_COL = 'order_purchase_timestamp'
+CATEGORY_COL = 'product_category_name_english'
+STATE_COL = 'customer_state'
+
+# Sentinel for "no purchase yet" in the int64 nanosecond timestamp arrays
+_NO_PURCHASE = np.iinfo(np.int64).max
+
+
+def _encode(labels: pd.Index, values: pd.Series):
+    """
+    Maps values to integer codes, appending unseen values to the end of `labels`.
+
+    Existing codes never change, which is what allows the matrix to grow incrementally.
+
+    Returns:
+        tuple: (updated labels, np.ndarray of int64 codes)
+    """
+    codes = labels.get_indexer(values)
+    unseen = codes < 0
+    if unseen.any():
+        labels = labels.append(pd.Index(pd.unique(values[unseen])))
+        codes = labels.get_indexer(values)
+    return labels, codes.astype(np.int64)
+
+
+def _grow(array: np.ndarray, size: int, fill) -> np.ndarray:
+    if len(array) >= size:
+        return array
+    return np.concatenate([array, np.full(size - len(array), fill, dtype=array.dtype)])
+
+
+class PurchaseCohorts:
+    """
+    Sparse customer x month purchase matrix for cohort and repeat-purchase analysis.
+
+    Customers (customer_unique_id) and purchase months are stored as integer codes,
+    and the number of orders of each customer in each month lives in a scipy CSR
+    matrix. Retention, time to second purchase and repeat rates are all derived from
+    that matrix and a few per-customer arrays, without pivoting the full frame.
+
+    New months can be added with `update()`, which only encodes the new orders and
+    adds them to the existing matrix.
+
+    Example:
+        cohorts = PurchaseCohorts.from_orders(df_analytics)
+        cohorts.retention_matrix()
+        cohorts.update(df_new_month)
+    """
+
+    def __init__(self):
+        self.customers = pd.Index([], dtype=object)
+        self.categories = pd.Index([], dtype=object)
+        self.states = pd.Index([], dtype=object)
+        self.base_month = None  # Month ordinal (year * 12 + month - 1) of column 0
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.first_purchase = np.empty(0, dtype=np.int64)
+        self.second_purchase = np.empty(0, dtype=np.int64)
+        self.first_category = np.empty(0, dtype=np.int64)
+        self.first_state = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    @instrument()
+    def from_orders(cls, df: pd.DataFrame) -> "PurchaseCohorts":
+        """
+        Builds the cohorts from an order-level or item-level dataframe.
+
+        Args:
+            df (pd.DataFrame): Must include 'customer_unique_id', 'order_id' and
+                               'order_purchase_timestamp'. 'product_category_name_english'
+                               and 'customer_state' are used for the repeat-rate breakdowns
+                               when present.
+
+        Returns:
+            PurchaseCohorts: The populated cohorts.
+        """
+        cohorts = cls()
+        cohorts.update(df)
+        return cohorts
+
+    @property
+    def n_customers(self) -> int:
+        return len(self.customers)
+
+    @property
+    def n_months(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def months(self) -> pd.PeriodIndex:
+        if self.base_month is None:
+            return pd.PeriodIndex([], freq='M')
+        ordinals = self.base_month + np.arange(self.n_months)
+        return pd.PeriodIndex.from_fields(year=ordinals // 12, month=ordinals % 12 + 1, freq='M')
+
+    @instrument()
+    def update(self, df: pd.DataFrame) -> "PurchaseCohorts":
+        """
+        Adds a batch of new orders (e.g. a newly landed month) to the cohorts.
+
+        Orders are de-duplicated on 'order_id' within the batch, so the item-level
+        master frame can be passed directly. Orders already added in a previous batch
+        must not be passed again, since they would be counted twice.
+
+        Args:
+            df (pd.DataFrame): New orders, same columns as in `from_orders`.
+
+        Returns:
+            PurchaseCohorts: self, to allow chaining.
+        """
+        columns = [c for c in [ORDER_COL, CUSTOMER_COL, TIMESTAMP_COL, CATEGORY_COL, STATE_COL] if c in df.columns]
+        orders = df[columns].dropna(subset=[CUSTOMER_COL, TIMESTAMP_COL])
+        if orders.empty:
+            return self
+        orders = orders.sort_values(TIMESTAMP_COL, kind='stable').drop_duplicates(ORDER_COL)
+
+        ts = pd.to_datetime(orders[TIMESTAMP_COL])
+        timestamps = ts.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        month_ordinals = (ts.dt.year * 12 + ts.dt.month - 1).to_numpy(dtype=np.int64)
+
+        if self.base_month is None:
+            self.base_month = int(month_ordinals.min())
+        elif month_ordinals.min() < self.base_month:
+            raise ValueError(
+                "New orders are older than the first month in the cohorts. "
+                "Rebuild with PurchaseCohorts.from_orders() to include earlier history."
+            )
+        month_codes = month_ordinals - self.base_month
+
+        self.customers, customer_codes = _encode(self.customers, orders[CUSTOMER_COL])
+        n_customers = len(self.customers)
+        n_months = max(self.n_months, int(month_codes.max()) + 1)
+
+        # Duplicate (customer, month) pairs are summed when converting COO -> CSR
+        batch = sparse.coo_matrix(
+            (np.ones(len(orders), dtype=np.int32), (customer_codes, month_codes)),
+            shape=(n_customers, n_months),
+        ).tocsr()
+        self.matrix.resize((n_customers, n_months))
+        self.matrix = self.matrix + batch
+
+        self._update_first_purchases(orders, customer_codes, timestamps)
+        return self
+
+    def _update_first_purchases(self, orders: pd.DataFrame, customer_codes: np.ndarray, timestamps: np.ndarray):
+        n_customers = len(self.customers)
+        previous_first = _grow(self.first_purchase, n_customers, _NO_PURCHASE)
+        previous_second = _grow(self.second_purchase, n_customers, _NO_PURCHASE)
+
+        # Two earliest orders of each customer inside the batch. Orders are sorted by
+        # timestamp, so a stable sort on the customer code keeps them chronological.
+        order = np.argsort(customer_codes, kind='stable')
+        sorted_codes = customer_codes[order]
+        sorted_ts = timestamps[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        batch_customers = sorted_codes[starts]
+        batch_first = sorted_ts[starts]
+        has_second = np.r_[starts[1:], len(sorted_codes)] - starts > 1
+        batch_second = np.where(has_second, sorted_ts[np.minimum(starts + 1, len(sorted_ts) - 1)], _NO_PURCHASE)
+
+        # Keep the two smallest of the four candidates (old first/second, batch first/second)
+        candidates = np.column_stack([
+            previous_first[batch_customers], previous_second[batch_customers], batch_first, batch_second,
+        ])
+        candidates.sort(axis=1)
+        new_first_found = batch_first < previous_first[batch_customers]
+        previous_first[batch_customers] = candidates[:, 0]
+        previous_second[batch_customers] = candidates[:, 1]
+        self.first_purchase, self.second_purchase = previous_first, previous_second
+
+        # Attributes of the first purchase (category, state) follow the first order
+        self.first_category = _grow(self.first_category, n_customers, -1)
+        self.first_state = _grow(self.first_state, n_customers, -1)
+        first_rows = order[starts][new_first_found]
+        changed = batch_customers[new_first_found]
+        if CATEGORY_COL in orders.columns:
+            self.categories, category_codes = _encode(self.categories, orders[CATEGORY_COL].fillna('unknown'))
+            self.first_category[changed] = category_codes[first_rows]
+        if STATE_COL in orders.columns:
+            self.states, state_codes = _encode(self.states, orders[STATE_COL].fillna('unknown'))
+            self.first_state[changed] = state_codes[first_rows]
+
+    @instrument()
+    def orders_per_customer(self) -> np.ndarray:
+        """Returns the total number of orders of each customer, indexed by customer code."""
+        return np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    def _first_month_codes(self) -> np.ndarray:
+        first = self.first_purchase.view('datetime64[ns]').astype('datetime64[M]').astype(np.int64)
+        # datetime64[M] counts months since 1970-01, month ordinals count since year 0
+        return first + 1970 * 12 - self.base_month
+
+    @instrument()
+    def retention_matrix(self, as_share: bool = True) -> pd.DataFrame:
+        """
+        Cohort retention matrix: first-purchase month x months since first purchase.
+
+        Args:
+            as_share (bool, optional): If True, values are the share of the cohort that
+                                       purchased in that month. If False, customer counts.
+
+        Returns:
+            pd.DataFrame: Rows are cohorts (first-purchase month), columns are month offsets.
+                          Offsets not yet observed for a cohort are NaN.
+        """
+        n_months = self.n_months
+        coo = self.matrix.tocoo()
+        cohort = self._first_month_codes()[coo.row]
+        offset = coo.col - cohort
+        counts = np.bincount(cohort * n_months + offset, minlength=n_months * n_months)
+        counts = counts.reshape(n_months, n_months).astype(float)
+
+        # A cohort starting in month c can only be observed for n_months - c offsets
+        observable = np.arange(n_months)[None, :] < (n_months - np.arange(n_months))[:, None]
+        counts[~observable] = np.nan
+        if as_share:
+            cohort_sizes = counts[:, 0]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                counts = counts / cohort_sizes[:, None]
+
+        result = pd.DataFrame(counts, index=self.months, columns=pd.RangeIndex(n_months, name='months_since_first'))
+        result.index.name = 'cohort'
+        return result[result.iloc[:, 0] > 0] if n_months else result
+
+    @instrument()
+    def retention_curve(self) -> pd.Series:
+        """
+        Share of customers active N months after their first purchase, pooled over all cohorts.
+
+        Only cohorts old enough to have been observed at offset N contribute to it.
+
+        Returns:
+            pd.Series: Retention share indexed by months since first purchase.
+        """
+        counts = self.retention_matrix(as_share=False)
+        active = counts.sum(axis=0, skipna=True)
+        eligible = counts.notna().mul(counts.iloc[:, 0], axis=0).sum(axis=0)
+        return (active / eligible).rename('retention')
+
+    @instrument()
+    def time_to_second_purchase(self) -> pd.Series:
+        """
+        Days between the first and second order of every repeat customer.
+
+        Returns:
+            pd.Series: Gaps in days, indexed by customer_unique_id.
+        """
+        repeat = self.second_purchase != _NO_PURCHASE
+        gaps_ns = self.second_purchase[repeat] - self.first_purchase[repeat]
+        return pd.Series(gaps_ns / 86_400e9, index=self.customers[repeat], name='days_to_second_purchase')
+
+    @instrument()
+    def repeat_rate_by(self, attribute: str) -> pd.DataFrame:
+        """
+        Repeat-purchase rate grouped by an attribute of the customer's first order.
+
+        Args:
+            attribute (str): 'category' (first order's product category) or 'state' (customer state).
+
+        Returns:
+            pd.DataFrame: 'customers', 'repeat_customers' and 'repeat_rate' per group,
+                          sorted by the number of customers.
+        """
+        if attribute == 'category':
+            codes, labels = self.first_category, self.categories
+        elif attribute == 'state':
+            codes, labels = self.first_state, self.states
+        else:
+            raise ValueError(f"Unknown attribute '{attribute}'. Use 'category' or 'state'.")
+        if len(labels) == 0:
+            raise ValueError(f"The orders passed to the cohorts had no column for '{attribute}'.")
+
+        known = codes >= 0
+        is_repeat = (self.orders_per_customer() >= 2)[known]
+        customers = np.bincount(codes[known], minlength=len(labels))
+        repeat_customers = np.bincount(codes[known], weights=is_repeat, minlength=len(labels)).astype(np.int64)
+
+        result = pd.DataFrame({'customers': customers, 'repeat_customers': repeat_customers}, index=labels)
+        result['repeat_rate'] = result['repeat_customers'] / result['customers']
+        result.index.name = attribute
+        return result.sort_values('customers', ascending=False)
+
+    @instrument()
+    def single_purchase_share(self) -> float:
+        """Share of customers with exactly one order (the '97.5%' headline figure)."""
+        orders = self.orders_per_customer()
+        return float((orders == 1).sum() / len(orders)) if len(orders) else float('nan')
@@ -2,6 +2,8 @@
 import pandas as pd
 from pathlib import Path
 
+from .instrumentation import instrument, record_io
+
 # __file__ é o caminho para o arquivo atual (data_utils.py)
 # .parent nos leva para o diretório pai (a pasta 'src')
 # .parent novamente nos leva para o pai de 'src', que é a RAIZ DO PROJETO.
@@ -10,22 +12,38 @@ PROJECT_ROOT = Path(__file__).parent.parent
 # Agora definimos os caminhos de dados a partir da raiz do projeto.
 DATA_DIR = PROJECT_ROOT / "data"
 
+@instrument()
 def load_raw(filename: str) -> pd.DataFrame:
-    """Carrega um arquivo CSV da pasta data/raw."""
+    """
+    Carrega um arquivo da pasta data/raw.
+
+    Usa o .parquet tipado gerado por scripts/download_data.py quando ele existe
+    e, caso contrário, lê o CSV original.
+    """
     raw_path = DATA_DIR / "raw" / filename
+    parquet_path = raw_path.with_suffix(".parquet")
+    if parquet_path.exists():
+        raw_path = parquet_path
     print(f"Loading data from: {raw_path}")
-    return pd.read_csv(raw_path)
+    df = pd.read_parquet(raw_path) if raw_path.suffix == ".parquet" else pd.read_csv(raw_path)
+    record_io(bytes_read=raw_path.stat().st_size)
+    return df
 
+@instrument()
 def save_processed(df: pd.DataFrame, name: str):
     """Salva um DataFrame como .parquet na pasta data/processed."""
     processed_dir = DATA_DIR / "processed"
     processed_dir.mkdir(parents=True, exist_ok=True)
     save_path = processed_dir / f"{name}.parquet"
     df.to_parquet(save_path, index=False)
+    record_io(bytes_written=save_path.stat().st_size)
     print(f"Data saved to: {save_path}")
 
+@instrument()
 def load_processed(name: str) -> pd.DataFrame:
     """Carrega um arquivo .parquet da pasta data/processed."""
     load_path = DATA_DIR / "processed" / f"{name}.parquet"
     print(f"Loading processed data from: {load_path}")
-    return pd.read_parquet(load_path)
\ No newline at end of file
+    df = pd.read_parquet(load_path)
+    record_io(bytes_read=load_path.stat().st_size)
+    return df
\ No newline at end of file
@@ -1,6 +1,9 @@
 # src/features.py
 import pandas as pd
 
+from .instrumentation import instrument
+
+@instrument()
 def add_order_value(df: pd.DataFrame):
     """
     Calcula o valor total de cada pedido e o adiciona como uma nova coluna 'order_value'.
@@ -19,6 +22,7 @@ def add_order_value(df: pd.DataFrame):
         print("Aviso: Coluna 'price' não encontrada. A feature 'order_value' não foi criada.")
     return df
 
+@instrument()
 def compute_shipping_time(df: pd.DataFrame):
     """
     Calcula o tempo de envio em dias entre a compra e a entrega.
@@ -40,6 +44,7 @@ def compute_shipping_time(df: pd.DataFrame):
     return df
 
 
+@instrument()
 def compute_shipping_delay(df: pd.DataFrame):
     """
     Calculates the shipping delay in days between the promised and delivered dates.
@@ -65,6 +70,7 @@ def compute_shipping_delay(df: pd.DataFrame):
     return df
 
  
+@instrument()
 def compute_delivery_total_time(df: pd.DataFrame):
 
     # Calculates the number of days between the order purchase day and delivery day
@@ -0,0 +1,347 @@
+# src/instrumentation.py
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; RSS fields are left as None without it
+    psutil = None
+
+# Verbosity levels:
+#   0 - instrumentation disabled, nothing is recorded
+#   1 - only top-level stages are emitted (e.g. a notebook calling clean_data)
+#   2 - every instrumented call is emitted, including nested ones
+QUIET, STAGES, DETAILED = 0, 1, 2
+
+_verbosity = int(os.environ.get("OLIST_INSTRUMENTATION_VERBOSITY", STAGES))
+_sinks = []
+_state = threading.local()
+
+logger = logging.getLogger("olist.instrumentation")
+
+
+class LoggingSink:
+    """Sends each record to a standard `logging` logger as a single line."""
+
+    def __init__(self, logger_name: str = "olist.instrumentation", level: int = logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def emit(self, record: dict):
+        fields = " ".join(f"{key}={value}" for key, value in record.items() if key != "stage" and value is not None)
+        self.logger.log(self.level, "[%s] %s", record["stage"], fields)
+
+
+class JsonLinesSink:
+    """Appends each record as one JSON object per line to a file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class CollectorSink:
+    """Keeps records in memory. Useful for tests and for inspecting a run from a notebook."""
+
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record: dict):
+        self.records.append(record)
+
+    def by_stage(self, stage: str) -> list:
+        return [r for r in self.records if r["stage"] == stage]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+    def clear(self):
+        self.records.clear()
+
+
+def set_verbosity(level: int):
+    """Sets the global verbosity level (QUIET, STAGES or DETAILED)."""
+    global _verbosity
+    _verbosity = int(level)
+
+
+def get_verbosity() -> int:
+    return _verbosity
+
+
+def add_sink(sink):
+    """Registers a sink. Any object with an `emit(record: dict)` method works."""
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def clear_sinks():
+    _sinks.clear()
+
+
+def configure(verbosity: int = None, log: bool = True, jsonl_path=None):
+    """
+    Turns instrumentation output on.
+
+    Records go to the 'olist.instrumentation' logger by default, which prints nothing
+    until a handler is attached. This attaches one that writes to stderr and, with
+    `jsonl_path`, also appends every record to a JSON-lines file.
+
+    Example:
+        from src.instrumentation import configure, DETAILED
+        configure(verbosity=DETAILED, jsonl_path="outputs/instrumentation.jsonl")
+
+    Args:
+        verbosity (int, optional): QUIET, STAGES or DETAILED. Unchanged if None.
+        log (bool, optional): Print the records to stderr. Defaults to True.
+        jsonl_path (str or Path, optional): File to append the records to.
+    """
+    if verbosity is not None:
+        set_verbosity(verbosity)
+    if log:
+        if not any(getattr(h, "_olist_instrumentation", False) for h in logger.handlers):
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+            handler._olist_instrumentation = True
+            logger.addHandler(handler)
+            # Avoid printing every record twice when the root logger is also configured
+            logger.propagate = False
+        logger.setLevel(logging.INFO)
+    if jsonl_path is not None:
+        # The default LoggingSink is only used when no sink is registered
+        if log and not any(isinstance(s, LoggingSink) for s in _sinks):
+            add_sink(LoggingSink())
+        add_sink(JsonLinesSink(jsonl_path))
+
+
+def _stack() -> list:
+    if not hasattr(_state, "stack"):
+        _state.stack = []
+    return _state.stack
+
+
+def _rss_bytes():
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def _read_hwm_bytes():
+    """Returns the process RSS high-water mark (VmHWM) on Linux, or None elsewhere."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class _RssSampler(threading.Thread):
+    """
+    Polls the process RSS every 10 ms and raises the peak of the open stages of one thread.
+
+    A single sampler is started by the outermost emitted stage and shared by every
+    stage nested in it, so nested calls never start threads of their own. Only records
+    whose peak is being measured (`rss_peak_bytes` not None) are updated.
+    """
+
+    def __init__(self, stack: list, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.stack = stack
+        self.interval = interval
+        self.lock = threading.Lock()
+        self._done = threading.Event()
+
+    def sample(self):
+        rss = _rss_bytes()
+        with self.lock:
+            for record in self.stack:
+                if record["rss_peak_bytes"] is not None and rss > record["rss_peak_bytes"]:
+                    record["rss_peak_bytes"] = rss
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def finish(self):
+        self._done.set()
+        self.join()
+        self.sample()
+
+
+def _count_rows(obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return len(obj)
+    return None
+
+
+def record_io(bytes_read: int = 0, bytes_written: int = 0):
+    """
+    Adds I/O volume to the record of the innermost active stage.
+
+    Instrumented functions call this after touching disk, since the decorator
+    itself cannot know which files were read or written. Does nothing when
+    called outside of an instrumented stage.
+    """
+    stack = _stack()
+    if not stack:
+        return
+    record = stack[-1]
+    record["bytes_read"] = (record["bytes_read"] or 0) + bytes_read
+    record["bytes_written"] = (record["bytes_written"] or 0) + bytes_written
+
+
+def _emit(record: dict):
+    sinks = _sinks or [LoggingSink()]
+    for sink in sinks:
+        try:
+            sink.emit(record)
+        except Exception:
+            # A broken sink must never break the pipeline step it is measuring
+            logger.exception("Instrumentation sink %r failed", sink)
+
+
+@contextmanager
+def track(stage: str, rows_in: int = None):
+    """
+    Context manager that measures a block of code as a named stage.
+
+    Records wall time, rows in/out, bytes read/written, the RSS delta of the
+    process and the RSS peak reached while the stage ran. Set `record["rows_out"]` on the yielded dict to report output rows.
+
+    Example:
+        with track("merge_master", rows_in=len(orders)) as rec:
+            df_master = orders.merge(...)
+            rec["rows_out"] = len(df_master)
+    """
+    if _verbosity <= QUIET:
+        # Still yield a dict so callers can set fields unconditionally
+        yield {}
+        return
+
+    stack = _stack()
+    record = {
+        "stage": stage,
+        "depth": len(stack),
+        "wall_time_s": None,
+        "rows_in": rows_in,
+        "rows_out": None,
+        "bytes_read": None,
+        "bytes_written": None,
+        "rss_delta_bytes": None,
+        "rss_peak_bytes": None,
+        "status": "ok",
+    }
+    # Memory is only measured for records that will be emitted; nested stages that are
+    # not emitted still raise their parent's peak through the parent's sampler.
+    emitted = record["depth"] == 0 or _verbosity >= DETAILED
+    sampler = None
+    if emitted:
+        rss_before = _rss_bytes()
+        hwm_before = _read_hwm_bytes()
+        record["rss_peak_bytes"] = rss_before
+        if psutil is not None and getattr(_state, "sampler", None) is None:
+            sampler = _state.sampler = _RssSampler(stack)
+            sampler.start()
+    start = time.perf_counter()
+    stack.append(record)
+    try:
+        yield record
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        record["wall_time_s"] = round(time.perf_counter() - start, 6)
+        if sampler is not None:
+            sampler.finish()
+            _state.sampler = None
+        shared = getattr(_state, "sampler", None)
+        if shared is not None:
+            with shared.lock:
+                stack.pop()
+        else:
+            stack.pop()
+        if emitted:
+            rss_after = _rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                record["rss_delta_bytes"] = rss_after - rss_before
+            peaks = [p for p in (record["rss_peak_bytes"], rss_after) if p is not None]
+            # VmHWM is the process-wide high-water mark since start. It is never reset, but
+            # if it rose while the stage ran, the new mark is a peak the stage reached,
+            # including spikes shorter than the sampling interval.
+            hwm_after = _read_hwm_bytes()
+            if hwm_before is not None and hwm_after is not None and hwm_after > hwm_before:
+                peaks.append(hwm_after)
+            record["rss_peak_bytes"] = max(peaks) if peaks else None
+        # Propagate I/O to the parent stage so top-level records stay complete at level 1
+        if stack:
+            parent = stack[-1]
+            for key in ("bytes_read", "bytes_written"):
+                if record[key]:
+                    parent[key] = (parent[key] or 0) + record[key]
+            if record["rss_peak_bytes"] is not None and parent["rss_peak_bytes"] is not None:
+                parent["rss_peak_bytes"] = max(parent["rss_peak_bytes"], record["rss_peak_bytes"])
+        if emitted:
+            _emit(record)
+
+
+def instrument(stage: str = None):
+    """
+    Decorator that wraps a function in `track()`.
+
+    Rows in are taken from the first DataFrame/Series argument and rows out from
+    the return value, when they are pandas objects.
+
+    Args:
+        stage (str, optional): Name of the stage. Defaults to 'module.function'.
+    """
+    def decorator(func):
+        name = stage or f"{func.__module__.split('.')[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _verbosity <= QUIET:
+                return func(*args, **kwargs)
+            rows_in = next(
+                (_count_rows(a) for a in (*args, *kwargs.values()) if _count_rows(a) is not None),
+                None,
+            )
+            with track(name, rows_in=rows_in) as record:
+                result = func(*args, **kwargs)
+                record["rows_out"] = _count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# OLIST_INSTRUMENTATION_LOG=1 prints the records to stderr and
+# OLIST_INSTRUMENTATION_JSONL=<path> appends them to a JSON-lines file,
+# so scripts and notebooks can be measured without changing their code.
+if os.environ.get("OLIST_INSTRUMENTATION_LOG") or os.environ.get("OLIST_INSTRUMENTATION_JSONL"):
+    configure(
+        log=os.environ.get("OLIST_INSTRUMENTATION_LOG", "0") not in ("", "0"),
+        jsonl_path=os.environ.get("OLIST_INSTRUMENTATION_JSONL") or None,
+    )
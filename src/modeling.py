@@ -0,0 +1,257 @@
+# src/modeling.py
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import loguniform, randint
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingRandomSearchCV)
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold, train_test_split
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from imblearn.pipeline import Pipeline
+from imblearn.under_sampling import RandomUnderSampler
+
+from .data_utils import DATA_DIR
+from .instrumentation import instrument, record_io
+
+# Same features and target used in notebook 04
+NUMERICAL_FEATURES = ['shipping_time_days', 'shipping_delay_days', 'price', 'freight_value']
+CATEGORICAL_FEATURES = ['product_category_name_english', 'customer_state']
+TARGET = 'is_bad_review'
+
+DESIGN_CACHE_DIR = DATA_DIR / "processed" / "design_matrices"
+
+# Search spaces for HalvingRandomSearchCV. Keys are prefixed with the pipeline step name.
+# class_weight is not searched: the undersampler already makes every training fold 1:1,
+# so 'balanced' would compute weights of 1.0 and behave exactly like None.
+SEARCH_SPACES = {
+    'logistic_regression': {
+        'model__C': loguniform(1e-3, 1e2),
+    },
+    'random_forest': {
+        'model__n_estimators': randint(100, 500),
+        'model__max_depth': [None, 8, 12, 16, 24],
+        'model__min_samples_leaf': randint(1, 20),
+        'model__max_features': ['sqrt', 'log2', 0.3],
+    },
+}
+
+
+@instrument()
+def build_model_frame(df: pd.DataFrame, numerical_features: list = None, categorical_features: list = None) -> pd.DataFrame:
+    """
+    Selects the modeling features and creates the binary target 'is_bad_review' (review_score <= 2).
+
+    Args:
+        df (pd.DataFrame): The analytics dataframe.
+        numerical_features (list, optional): Defaults to NUMERICAL_FEATURES.
+        categorical_features (list, optional): Defaults to CATEGORICAL_FEATURES.
+
+    Returns:
+        pd.DataFrame: Features plus the 'is_bad_review' column, without missing values.
+    """
+    numerical_features = numerical_features or NUMERICAL_FEATURES
+    categorical_features = categorical_features or CATEGORICAL_FEATURES
+
+    model_df = df[numerical_features + categorical_features + ['review_score']].dropna().copy()
+    model_df[TARGET] = (model_df['review_score'] <= 2).astype('int8')
+    return model_df.drop(columns='review_score')
+
+
+def _cache_key(model_df: pd.DataFrame, numerical_features: list, categorical_features: list,
+               seed: int, test_size: float) -> str:
+    # The data fingerprint keeps a stale cache from being reused after the processed data changes
+    fingerprint = pd.util.hash_pandas_object(model_df, index=True).to_numpy()
+    payload = json.dumps({
+        'numerical': list(numerical_features),
+        'categorical': list(categorical_features),
+        'seed': seed,
+        'test_size': test_size,
+    }, sort_keys=True).encode()
+    return hashlib.sha256(payload + fingerprint.tobytes()).hexdigest()[:16]
+
+
+def _save_csr(matrix: sparse.csr_matrix, folder, prefix: str):
+    for part in ('data', 'indices', 'indptr'):
+        path = folder / f"{prefix}_{part}.npy"
+        np.save(path, getattr(matrix, part))
+        record_io(bytes_written=path.stat().st_size)
+
+
+def _load_csr(folder, prefix: str, shape: tuple) -> sparse.csr_matrix:
+    # mmap_mode='r' keeps the arrays on disk; the OS pages them in as the models read them
+    parts = [np.load(folder / f"{prefix}_{part}.npy", mmap_mode='r') for part in ('data', 'indices', 'indptr')]
+    record_io(bytes_read=sum(p.nbytes for p in parts))
+    return sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+@instrument()
+def cached_design_matrices(model_df: pd.DataFrame, numerical_features: list = None,
+                           categorical_features: list = None, seed: int = 42,
+                           test_size: float = 0.2, cache_dir=DESIGN_CACHE_DIR) -> dict:
+    """
+    Returns the preprocessed train/test matrices, building them only on a cache miss.
+
+    The split and the preprocessing (StandardScaler + OneHotEncoder) are the same as in
+    notebook 04, with the preprocessor fitted on the training split only. The result is
+    stored as CSR arrays in data/processed/design_matrices/<key>/ and loaded back
+    memory-mapped. The key covers the feature lists, the split seed, the test size and
+    a hash of the data.
+
+    Args:
+        model_df (pd.DataFrame): Output of build_model_frame.
+        numerical_features (list, optional): Defaults to NUMERICAL_FEATURES.
+        categorical_features (list, optional): Defaults to CATEGORICAL_FEATURES.
+        seed (int, optional): random_state of the train/test split.
+        test_size (float, optional): Share of rows held out for the test set.
+        cache_dir (Path, optional): Root folder of the cache.
+
+    Returns:
+        dict: 'X_train', 'X_test' (CSR), 'y_train', 'y_test' (np.ndarray),
+              'feature_names' (list) and 'cache_key' (str).
+    """
+    numerical_features = numerical_features or NUMERICAL_FEATURES
+    categorical_features = categorical_features or CATEGORICAL_FEATURES
+    key = _cache_key(model_df, numerical_features, categorical_features, seed, test_size)
+    folder = cache_dir / key
+    meta_path = folder / "meta.json"
+
+    if not meta_path.exists():
+        print(f"Building design matrices (cache key {key})...")
+        X = model_df[numerical_features + categorical_features]
+        y = model_df[TARGET].to_numpy()
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=test_size, random_state=seed, stratify=y
+        )
+
+        preprocessor = ColumnTransformer(
+            transformers=[
+                ('num', StandardScaler(), numerical_features),
+                ('cat', OneHotEncoder(handle_unknown='ignore', sparse_output=True), categorical_features),
+            ],
+            sparse_threshold=1.0,  # Always return a sparse matrix
+        )
+        X_train = sparse.csr_matrix(preprocessor.fit_transform(X_train), dtype=np.float64)
+        X_test = sparse.csr_matrix(preprocessor.transform(X_test), dtype=np.float64)
+
+        folder.mkdir(parents=True, exist_ok=True)
+        _save_csr(X_train, folder, "X_train")
+        _save_csr(X_test, folder, "X_test")
+        np.save(folder / "y_train.npy", y_train)
+        np.save(folder / "y_test.npy", y_test)
+        # meta.json is written last, so an interrupted build is never read as a valid cache entry
+        meta_path.write_text(json.dumps({
+            'train_shape': X_train.shape,
+            'test_shape': X_test.shape,
+            'feature_names': list(preprocessor.get_feature_names_out()),
+        }))
+    else:
+        print(f"Loading cached design matrices (cache key {key})")
+
+    meta = json.loads(meta_path.read_text())
+    return {
+        'X_train': _load_csr(folder, "X_train", tuple(meta['train_shape'])),
+        'X_test': _load_csr(folder, "X_test", tuple(meta['test_shape'])),
+        'y_train': np.load(folder / "y_train.npy", mmap_mode='r'),
+        'y_test': np.load(folder / "y_test.npy", mmap_mode='r'),
+        'feature_names': meta['feature_names'],
+        'cache_key': key,
+    }
+
+
+def _review_pipeline(model, seed: int) -> Pipeline:
+    # The imblearn Pipeline only resamples during fit, so every CV fold is undersampled
+    # on its own training part and scored on its untouched (imbalanced) validation part.
+    return Pipeline([
+        ('undersample', RandomUnderSampler(random_state=seed)),
+        ('model', model),
+    ])
+
+
+@instrument()
+def search_review_models(X_train, y_train, models: list = None, n_candidates: int = 30,
+                         cv: int = 5, seed: int = 42, n_jobs: int = -1) -> dict:
+    """
+    Tunes the bad-review classifiers with successive halving, selecting on recall of bad reviews.
+
+    Each candidate is an undersampler + classifier pipeline. HalvingRandomSearchCV starts
+    all candidates on a small share of the training rows and keeps only the best third
+    for each larger round, with the folds evaluated in parallel on all cores. The first
+    round is sized so that the last one trains on the full training set, so the selected
+    model's CV recall is measured at full size.
+
+    Args:
+        X_train: Training matrix (e.g. from cached_design_matrices).
+        y_train: Training target.
+        models (list, optional): Keys of SEARCH_SPACES to tune. Defaults to all.
+        n_candidates (int, optional): Candidates sampled in the first round.
+        cv (int, optional): Number of stratified folds.
+        seed (int, optional): Seed for the sampler, the folds and the models.
+        n_jobs (int, optional): Parallel jobs of the search (-1 uses all cores).
+
+    Returns:
+        dict: Model name -> fitted HalvingRandomSearchCV.
+    """
+    estimators = {
+        'logistic_regression': LogisticRegression(max_iter=1000, random_state=seed),
+        # n_jobs=1 here: the search already parallelises over candidates and folds
+        'random_forest': RandomForestClassifier(random_state=seed, n_jobs=1),
+    }
+    models = models or list(SEARCH_SPACES)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed)
+
+    searches = {}
+    for name in models:
+        print(f"Searching {name}...")
+        start = time.perf_counter()
+        search = HalvingRandomSearchCV(
+            _review_pipeline(estimators[name], seed),
+            SEARCH_SPACES[name],
+            n_candidates=n_candidates,
+            factor=3,
+            resource='n_samples',
+            min_resources='exhaust',
+            scoring='recall',  # Recall of the positive class (is_bad_review == 1)
+            cv=folds,
+            random_state=seed,
+            n_jobs=n_jobs,
+            refit=True,
+        )
+        search.fit(X_train, np.asarray(y_train))
+        print(f"  - best CV recall {search.best_score_:.4f} in {time.perf_counter() - start:.1f}s")
+        searches[name] = search
+    return searches
+
+
+@instrument()
+def summarize_searches(searches: dict, X_test, y_test) -> pd.DataFrame:
+    """
+    Evaluates the best estimator of each search on the test set.
+
+    Returns:
+        pd.DataFrame: One row per model with CV recall, test recall/precision/F1 for bad
+                      reviews, ROC AUC, the number of candidates tried and the best parameters,
+                      sorted by test recall.
+    """
+    y_test = np.asarray(y_test)
+    rows = []
+    for name, search in searches.items():
+        y_pred = search.predict(X_test)
+        y_score = search.predict_proba(X_test)[:, 1]
+        rows.append({
+            'model': name,
+            'cv_recall': search.best_score_,
+            'test_recall': recall_score(y_test, y_pred),
+            'test_precision': precision_score(y_test, y_pred),
+            'test_f1': f1_score(y_test, y_pred),
+            'test_roc_auc': roc_auc_score(y_test, y_score),
+            'candidates': len(search.cv_results_['params']),
+            'best_params': search.best_params_,
+        })
+    return pd.DataFrame(rows).set_index('model').sort_values('test_recall', ascending=False)
@@ -0,0 +1,325 @@
+# src/report.py
+import hashlib
+import html
+import json
+import re
+from pathlib import Path
+
+from .instrumentation import instrument, record_io
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow the full-resolution image is reused as its own thumbnail
+    Image = None
+
+try:
+    import mistune
+except ImportError:  # A minimal built-in converter is used instead
+    mistune = None
+
+# Same path logic used in data_utils and viz
+PROJECT_ROOT = Path(__file__).parent.parent
+OUTPUTS_DIR = PROJECT_ROOT / "outputs"
+FIGURES_DIR = OUTPUTS_DIR / "figures"
+TABLES_DIR = OUTPUTS_DIR / "tables"
+THUMBNAILS_DIR = OUTPUTS_DIR / "thumbnails"
+REPORT_NOTEBOOK = PROJECT_ROOT / "notebooks" / "05_final_report.ipynb"
+REPORT_PATH = OUTPUTS_DIR / "05_final_report.html"
+CACHE_PATH = OUTPUTS_DIR / ".report_cache.json"
+
+# Bump this whenever the HTML layout changes, so every cached section is re-rendered
+RENDERER_VERSION = "1"
+THUMBNAIL_WIDTH = 640
+
+_FIGURE_PATTERN = re.compile(r"['\"]([\w\-. ]+\.png)['\"]")
+_ANCHOR_PATTERN = re.compile(r"<a id=['\"]([\w\-]+)['\"]>\s*</a>")
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; max-width: 1100px; margin: 2rem auto; padding: 0 1rem; line-height: 1.55; color: #222; }}
+section {{ margin-bottom: 2.5rem; }}
+.figures {{ display: flex; flex-wrap: wrap; gap: 1rem; }}
+figure {{ margin: 0; flex: 1 1 320px; }}
+figure img {{ width: 100%; height: auto; border: 1px solid #ddd; }}
+figcaption {{ font-size: 0.85rem; color: #555; }}
+table {{ border-collapse: collapse; margin: 1rem 0; font-size: 0.9rem; }}
+th, td {{ border: 1px solid #ccc; padding: 0.3rem 0.6rem; text-align: right; }}
+th:first-child, td:first-child {{ text-align: left; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+@instrument()
+def save_kpi_table(df, name: str):
+    """
+    Saves a KPI table as CSV in outputs/tables so the report builder can embed it.
+
+    Args:
+        df (pd.DataFrame): The KPI table. The index is kept.
+        name (str): File name without extension (e.g. 'review_score_by_delay').
+    """
+    TABLES_DIR.mkdir(parents=True, exist_ok=True)
+    save_path = TABLES_DIR / f"{name}.csv"
+    df.to_csv(save_path)
+    record_io(bytes_written=save_path.stat().st_size)
+    print(f"KPI table saved at: {save_path}")
+    return save_path
+
+
+def _file_digest(path: Path, file_hashes: dict) -> str:
+    """
+    Returns the sha256 of a file, reusing the cached digest while size and mtime are unchanged.
+    """
+    stat = path.stat()
+    key = str(path)
+    cached = file_hashes.get(key)
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["sha256"]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    record_io(bytes_read=stat.st_size)
+    file_hashes[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+    return file_hashes[key]["sha256"]
+
+
+def _inline_markdown(text: str) -> str:
+    text = html.escape(text, quote=False)
+    text = re.sub(r"`([^`]+)`", r"<code>\1</code>", text)
+    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+    text = re.sub(r"(?<![\w*])\*([^*]+)\*(?![\w*])", r"<em>\1</em>", text)
+    text = re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", r'<a href="\2">\1</a>', text)
+    return text
+
+
+def _simple_markdown(text: str) -> str:
+    """
+    Small markdown subset (headings, lists, pipe tables, rules, emphasis) used when mistune is not installed.
+    """
+    out = []
+    paragraph, list_items, list_tag, table_rows = [], [], None, []
+
+    def flush():
+        nonlocal list_tag
+        if paragraph:
+            out.append("<p>" + _inline_markdown(" ".join(paragraph)) + "</p>")
+            paragraph.clear()
+        if list_items:
+            items = "".join(f"<li>{_inline_markdown(item)}</li>" for item in list_items)
+            out.append(f"<{list_tag}>{items}</{list_tag}>")
+            list_items.clear()
+            list_tag = None
+        if table_rows:
+            rows = [r for r in table_rows if not re.fullmatch(r"[\s|:\-]+", r)]
+            cells = [[c.strip() for c in r.strip().strip("|").split("|")] for r in rows]
+            head = "".join(f"<th>{_inline_markdown(c)}</th>" for c in cells[0])
+            body = "".join(
+                "<tr>" + "".join(f"<td>{_inline_markdown(c)}</td>" for c in row) + "</tr>" for row in cells[1:]
+            )
+            out.append(f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>")
+            table_rows.clear()
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = re.match(r"(#{1,6})\s+(.*)", stripped)
+        bullet = re.match(r"[-*]\s+(.*)", stripped)
+        numbered = re.match(r"\d+\.\s+(.*)", stripped)
+        if not stripped:
+            flush()
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline_markdown(heading.group(2))}</h{level}>")
+        elif re.fullmatch(r"-{3,}|\*{3,}", stripped):
+            flush()
+            out.append("<hr>")
+        elif stripped.startswith("|"):
+            if paragraph or list_items:
+                flush()
+            table_rows.append(stripped)
+        elif bullet or numbered:
+            tag = "ul" if bullet else "ol"
+            if paragraph or table_rows or (list_tag and list_tag != tag):
+                flush()
+            list_tag = tag
+            list_items.append((bullet or numbered).group(1))
+        elif list_items and line.startswith((" ", "\t")):
+            list_items[-1] += " " + stripped
+        else:
+            if list_items or table_rows:
+                flush()
+            paragraph.append(stripped)
+    flush()
+    return "\n".join(out)
+
+
+@instrument()
+def markdown_to_html(text: str) -> str:
+    """Converts a notebook markdown cell to HTML, using mistune when it is available."""
+    text = _ANCHOR_PATTERN.sub("", text)
+    if mistune is not None:
+        return mistune.html(text)
+    return _simple_markdown(text)
+
+
+@instrument()
+def load_report_sections(notebook_path: Path = REPORT_NOTEBOOK) -> list:
+    """
+    Reads the final report notebook as plain JSON (no Jupyter needed) and splits it into sections.
+
+    Every markdown cell starts a new section. The figures a section shows are the
+    '*.png' names referenced by the code cells that follow it.
+
+    Returns:
+        list: Dicts with 'id', 'markdown' and 'figures' keys.
+    """
+    notebook_path = Path(notebook_path)
+    notebook = json.loads(notebook_path.read_text(encoding="utf-8"))
+    record_io(bytes_read=notebook_path.stat().st_size)
+    sections = []
+    for cell in notebook["cells"]:
+        source = "".join(cell["source"])
+        if cell["cell_type"] == "markdown":
+            anchor = _ANCHOR_PATTERN.search(source)
+            section_id = anchor.group(1) if anchor else f"section-{len(sections)}"
+            sections.append({"id": section_id, "markdown": source, "figures": []})
+        elif cell["cell_type"] == "code" and sections:
+            for figure in _FIGURE_PATTERN.findall(source):
+                if figure not in sections[-1]["figures"]:
+                    sections[-1]["figures"].append(figure)
+    return sections
+
+
+def _make_thumbnail(figure_path: Path) -> Path:
+    """Writes a downscaled copy of the figure to outputs/thumbnails and returns its path."""
+    if Image is None:
+        return figure_path
+    THUMBNAILS_DIR.mkdir(parents=True, exist_ok=True)
+    thumb_path = THUMBNAILS_DIR / figure_path.name
+    with Image.open(figure_path) as img:
+        img.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+        img.save(thumb_path, optimize=True)
+    record_io(bytes_written=thumb_path.stat().st_size)
+    return thumb_path
+
+
+def _render_figures(figures: list) -> str:
+    blocks = []
+    for name in figures:
+        figure_path = FIGURES_DIR / name
+        if not figure_path.exists():
+            blocks.append(f"<figure><figcaption>Image not found: {html.escape(name)}</figcaption></figure>")
+            continue
+        thumb_path = _make_thumbnail(figure_path)
+        full_src = figure_path.relative_to(OUTPUTS_DIR).as_posix()
+        thumb_src = thumb_path.relative_to(OUTPUTS_DIR).as_posix()
+        caption = html.escape(figure_path.stem.replace("_", " ").capitalize())
+        blocks.append(
+            f'<figure><a href="{full_src}"><img src="{thumb_src}" alt="{caption}" loading="lazy"></a>'
+            f"<figcaption>{caption}</figcaption></figure>"
+        )
+    return f'<div class="figures">{"".join(blocks)}</div>' if blocks else ""
+
+
+def _thumbnails_exist(section: dict) -> bool:
+    if Image is None:
+        return True
+    return all(
+        (THUMBNAILS_DIR / name).exists() for name in section["figures"] if (FIGURES_DIR / name).exists()
+    )
+
+
+def _render_table(table_path: Path) -> str:
+    import pandas as pd
+
+    df = pd.read_csv(table_path, index_col=0)
+    title = html.escape(table_path.stem.replace("_", " ").capitalize())
+    return f"<h3>{title}</h3>" + df.to_html(border=0, float_format=lambda v: f"{v:,.2f}")
+
+
+def _render_section(section: dict) -> str:
+    parts = [markdown_to_html(section["markdown"]), _render_figures(section["figures"])]
+    for table_path in section.get("tables", []):
+        parts.append(_render_table(table_path))
+    return f'<section id="{section["id"]}">\n' + "\n".join(p for p in parts if p) + "\n</section>"
+
+
+def _section_hash(section: dict, file_hashes: dict) -> str:
+    digest = hashlib.sha256(RENDERER_VERSION.encode())
+    digest.update(section["markdown"].encode("utf-8"))
+    for name in section["figures"]:
+        figure_path = FIGURES_DIR / name
+        digest.update(name.encode())
+        digest.update(_file_digest(figure_path, file_hashes).encode() if figure_path.exists() else b"missing")
+    for table_path in section.get("tables", []):
+        digest.update(table_path.name.encode())
+        digest.update(_file_digest(table_path, file_hashes).encode())
+    return digest.hexdigest()
+
+
+@instrument()
+def build_report(notebook_path: Path = REPORT_NOTEBOOK, output_path: Path = REPORT_PATH, force: bool = False) -> Path:
+    """
+    Builds the HTML report from the final report notebook's text, the saved figures and the cached KPI tables.
+
+    Nothing is executed: the narrative comes from the notebook's markdown cells, the
+    charts from outputs/figures and the KPI tables from outputs/tables. Each section is
+    hashed together with the files it embeds, and only sections whose hash changed
+    since the last build are re-rendered.
+
+    Args:
+        notebook_path (Path, optional): Notebook providing the narrative and figure references.
+        output_path (Path, optional): Where the HTML is written.
+        force (bool, optional): Ignores the cache and re-renders every section.
+
+    Returns:
+        Path: The path of the generated HTML file.
+    """
+    sections = load_report_sections(notebook_path)
+    tables = sorted(TABLES_DIR.glob("*.csv")) if TABLES_DIR.exists() else []
+    if tables:
+        sections.append({"id": "kpi-tables", "markdown": "## KPI Tables", "figures": [], "tables": tables})
+
+    cache = {}
+    if CACHE_PATH.exists() and not force:
+        cache = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+    cached_sections = cache.get("sections", {})
+    file_hashes = cache.get("files", {})
+
+    rendered, new_cache, rerendered = [], {}, 0
+    for section in sections:
+        section_hash = _section_hash(section, file_hashes)
+        cached = cached_sections.get(section["id"])
+        if cached and cached["hash"] == section_hash and _thumbnails_exist(section):
+            section_html = cached["html"]
+        else:
+            section_html = _render_section(section)
+            rerendered += 1
+        new_cache[section["id"]] = {"hash": section_hash, "html": section_html}
+        rendered.append(section_html)
+
+    title_match = re.search(r"^#\s+(.*)$", sections[0]["markdown"], flags=re.M) if sections else None
+    title = html.escape(title_match.group(1)) if title_match else "Olist E-commerce Report"
+    page = _PAGE_TEMPLATE.format(title=title, body="\n".join(rendered))
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(page, encoding="utf-8")
+    record_io(bytes_written=output_path.stat().st_size)
+
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_PATH.write_text(json.dumps({"sections": new_cache, "files": file_hashes}), encoding="utf-8")
+
+    print(f"Report saved at: {output_path} ({rerendered} of {len(sections)} sections re-rendered)")
+    return output_path
@@ -0,0 +1,224 @@
+# src/sellers.py
+import pandas as pd
+
+from .instrumentation import instrument
+
+WINDOWS = (30, 90)
+
+# Additive per-seller, per-day quantities. Every metric is a ratio of these sums,
+# which is what makes the windows updatable by adding and subtracting days.
+SUM_COLUMNS = [
+    'orders', 'delivered_orders', 'late_orders', 'delay_days',
+    'reviewed_orders', 'bad_reviews', 'revenue', 'freight',
+]
+
+
+def _order_sums(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Additive sums of each order and seller, with the purchase day of the order.
+
+    Returns:
+        pd.DataFrame: Indexed by (order_id, seller_id), with 'day' and the columns in SUM_COLUMNS.
+    """
+    df = df.dropna(subset=['seller_id', 'order_purchase_timestamp'])
+    df = df.assign(day=df['order_purchase_timestamp'].dt.normalize())
+
+    item_keys = ['order_id', 'order_item_id'] if 'order_item_id' in df.columns else ['order_id', 'seller_id', 'product_id']
+    items = df.drop_duplicates(item_keys)
+    item_sums = items.groupby(['order_id', 'seller_id'])[['price', 'freight_value']].sum()
+    item_sums.columns = ['revenue', 'freight']
+
+    orders = df.drop_duplicates(['order_id', 'seller_id'])
+    delivered = orders['order_delivered_customer_date'].notna()
+    # Same definition as features.compute_shipping_delay (whole days late, never negative).
+    # An order is late when that delay is > 0, as in notebook 02: Olist's estimated dates are
+    # at midnight, so comparing raw timestamps would flag deliveries on the promised day.
+    if 'shipping_delay_days' in orders.columns:
+        delay = orders['shipping_delay_days'].astype('float64')
+    else:
+        delay = (orders['order_delivered_customer_date'] - orders['order_estimated_delivery_date']).dt.days.clip(lower=0)
+    reviewed = orders['review_score'].notna()
+
+    order_flags = pd.DataFrame({
+        'order_id': orders['order_id'],
+        'seller_id': orders['seller_id'],
+        'day': orders['day'],
+        'orders': 1,
+        'delivered_orders': delivered.astype('int64'),
+        'late_orders': (delay > 0).astype('int64'),
+        'delay_days': delay.where(delivered, 0).fillna(0),
+        'reviewed_orders': reviewed.astype('int64'),
+        'bad_reviews': (orders['review_score'] <= 2).astype('int64'),
+    }).set_index(['order_id', 'seller_id'])
+
+    sums = order_flags.join(item_sums, how='left')
+    sums[['revenue', 'freight']] = sums[['revenue', 'freight']].fillna(0)
+    return sums[['day'] + SUM_COLUMNS]
+
+
+@instrument()
+def seller_daily_sums(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates the master dataframe into additive seller x purchase-day sums.
+
+    Item-level columns (revenue, freight) are counted once per order item, and
+    order-level columns (delivery, review) once per order and seller, so the
+    duplicated rows of the payments/reviews merge do not inflate the totals.
+
+    Args:
+        df (pd.DataFrame): Master dataframe with 'seller_id', 'order_id', 'order_purchase_timestamp',
+                           'order_delivered_customer_date', 'order_estimated_delivery_date',
+                           'review_score', 'price' and 'freight_value'. The date columns must
+                           already be datetime (see cleaning.clean_data).
+
+    Returns:
+        pd.DataFrame: One row per seller and day with the columns in SUM_COLUMNS.
+    """
+    sums = _order_sums(df)
+    daily = sums.reset_index().groupby(['seller_id', 'day'])[SUM_COLUMNS].sum()
+    return daily.reset_index()
+
+
+def _metrics_from_sums(sums: pd.DataFrame, suffix: str = '') -> pd.DataFrame:
+    delivered = sums['delivered_orders'].where(sums['delivered_orders'] > 0)
+    reviewed = sums['reviewed_orders'].where(sums['reviewed_orders'] > 0)
+    revenue = sums['revenue'].where(sums['revenue'] > 0)
+    metrics = pd.DataFrame({
+        'orders': sums['orders'],
+        'late_delivery_rate': sums['late_orders'] / delivered,
+        'mean_shipping_delay_days': sums['delay_days'] / delivered,
+        'bad_review_share': sums['bad_reviews'] / reviewed,
+        'revenue': sums['revenue'],
+        'freight_ratio': sums['freight'] / revenue,
+    }, index=sums.index)
+    return metrics.add_suffix(suffix)
+
+
+@instrument()
+def rolling_seller_metrics(df: pd.DataFrame, windows: tuple = WINDOWS) -> pd.DataFrame:
+    """
+    Computes per-seller rolling metrics for every day a seller had orders.
+
+    The master frame is reduced to seller x day sums once, sorted, and each window
+    is a single time-indexed groupby-rolling sum over that small frame.
+
+    Args:
+        df (pd.DataFrame): Master dataframe (see seller_daily_sums).
+        windows (tuple, optional): Window lengths in days. Defaults to (30, 90).
+
+    Returns:
+        pd.DataFrame: Indexed by (seller_id, day), with columns such as
+                      'late_delivery_rate_30d' and 'freight_ratio_90d'.
+    """
+    daily = seller_daily_sums(df).sort_values(['seller_id', 'day'])
+    grouped = daily.set_index('day').groupby('seller_id')[SUM_COLUMNS]
+
+    results = []
+    for window in windows:
+        sums = grouped.rolling(f'{window}D').sum()
+        results.append(_metrics_from_sums(sums, suffix=f'_{window}d'))
+    return pd.concat(results, axis=1)
+
+
+class SellerWindowState:
+    """
+    Running 30/90-day seller metrics that are updated one day of orders at a time.
+
+    The state keeps the seller sums of each day still inside the longest window, the
+    contribution of every order in that window, and a running total per window. Adding
+    a batch applies only the difference it makes: new orders are added, an order sent
+    again (e.g. once it is delivered or reviewed) replaces its previous contribution,
+    and the days that just left each window are subtracted. The cost depends on the
+    new (and expiring) rows only, never on the full order history.
+
+    Example:
+        state = SellerWindowState()
+        state.update(df_history)      # first load
+        state.update(df_today)        # daily refresh
+        state.metrics()
+    """
+
+    def __init__(self, windows: tuple = WINDOWS):
+        self.windows = tuple(sorted(windows))
+        self.as_of = None
+        self.days = {}  # day -> seller sums of that day (indexed by seller_id)
+        self.orders = pd.DataFrame(
+            columns=['day'] + SUM_COLUMNS,
+            index=pd.MultiIndex.from_tuples([], names=['order_id', 'seller_id']),
+        )  # (order_id, seller_id) -> contribution of that order, for orders in the longest window
+        self.totals = {w: pd.DataFrame(columns=SUM_COLUMNS, dtype='float64') for w in self.windows}
+
+    @instrument()
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds new orders to the windows and returns the metrics as of the latest day.
+
+        Orders are placed on their purchase day, also when they arrive late. An order
+        that is already in the state is replaced by the new rows, so every batch must
+        include all the items of the orders it contains (as the master frame does).
+        Orders older than the longest window are ignored.
+
+        Args:
+            df (pd.DataFrame): New or updated rows of the master dataframe.
+
+        Returns:
+            pd.DataFrame: Current metrics, see `metrics()`.
+        """
+        batch = _order_sums(df)
+        if batch.empty:
+            return self.metrics()
+
+        new_as_of = batch['day'].max() if self.as_of is None else max(self.as_of, batch['day'].max())
+        previous_as_of = self.as_of if self.as_of is not None else new_as_of
+        self.as_of = new_as_of
+
+        # Days that slid out of a window since the previous update are subtracted from its total
+        for window in self.windows:
+            old_start = previous_as_of - pd.Timedelta(days=window)
+            new_start = new_as_of - pd.Timedelta(days=window)
+            for day in [d for d in self.days if old_start < d <= new_start]:
+                self.totals[window] = self.totals[window].sub(self.days[day], fill_value=0)
+
+        oldest = new_as_of - pd.Timedelta(days=self.windows[-1])
+        for day in [d for d in self.days if d <= oldest]:
+            del self.days[day]
+        self.orders = self.orders[self.orders['day'] > oldest]
+        batch = batch[batch['day'] > oldest]
+
+        # Net change of the batch: its orders minus what the re-sent ones contributed before
+        replaced = self.orders[self.orders.index.isin(batch.index)]
+        previous = replaced.copy()
+        previous[SUM_COLUMNS] = -previous[SUM_COLUMNS]
+        delta = pd.concat([batch, previous]).reset_index()
+        self.orders = pd.concat([self.orders.drop(replaced.index), batch])
+
+        for day, sums in delta.groupby('day'):
+            sums = sums.groupby('seller_id')[SUM_COLUMNS].sum()
+            self.days[day] = sums if day not in self.days else self.days[day].add(sums, fill_value=0)
+            for window in self.windows:
+                if day > new_as_of - pd.Timedelta(days=window):
+                    self.totals[window] = self.totals[window].add(sums, fill_value=0)
+
+        # Sellers whose window emptied out are dropped instead of kept as all-zero rows
+        for window in self.windows:
+            total = self.totals[window]
+            self.totals[window] = total[total['orders'].round(9) > 0]
+        return self.metrics()
+
+    @instrument()
+    def metrics(self) -> pd.DataFrame:
+        """
+        Returns the current metrics of every seller with orders in the longest window.
+
+        Returns:
+            pd.DataFrame: Indexed by seller_id, with one set of columns per window
+                          (e.g. 'late_delivery_rate_30d', 'revenue_90d').
+        """
+        frames = [_metrics_from_sums(self.totals[w], suffix=f'_{w}d') for w in self.windows]
+        result = pd.concat(frames, axis=1)
+        # A seller active only in the longer window had no orders (and no revenue) in the shorter one
+        for window in self.windows:
+            for column in ('orders', 'revenue'):
+                result[f'{column}_{window}d'] = result[f'{column}_{window}d'].fillna(0)
+        result.index.name = 'seller_id'
+        return result
@@ -7,11 +7,14 @@ import matplotlib.image as mpimg
 import seaborn as sns
 from pathlib import Path
 
+from .instrumentation import instrument, record_io
+
 # Define o caminho para salvar as figuras, usando a mesma lógica do data_utils
 PROJECT_ROOT = Path(__file__).parent.parent
 OUTPUTS_DIR = PROJECT_ROOT / "outputs" / "figures"
 figures_path = OUTPUTS_DIR / "figures"
 
+@instrument()
 def plot_hist(series: pd.Series, title: str = "", xlabel: str = "", bins: int = 1000, save_path: str = None):
     """
     Plota e opcionalmente salva um histograma para uma série de dados.
@@ -40,11 +43,13 @@ def plot_hist(series: pd.Series, title: str = "", xlabel: str = "", bins: int =
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Histogram saved at: {full_path}")
 
     plt.show()
 
 
+@instrument()
 def plot_scatter(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None):
     """
     Plota e opcionalmente salva um gráfico de dispersão para duas séries de dados.
@@ -73,11 +78,13 @@ def plot_scatter(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "",
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Plot saved at: {full_path}")
 
     plt.show()
 
 
+@instrument()
 def line_plot(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None):
     """
     Plots and optionally saves a line plot for two data series.
@@ -105,12 +112,14 @@ def line_plot(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "", yla
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Plot saved at: {full_path}")
 
 
 
     plt.show()
 
+@instrument()
 def plot_bar(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None, hue: str = None, orientation: str = None):
     """
     Plota e opcionalmente salva um gráfico de barras para duas séries de dados.
@@ -140,12 +149,14 @@ def plot_bar(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "", ylab
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Plot saved at: {full_path}")
 
     plt.show()
 
 
 
+@instrument()
 def plot_heatmap(data: pd.DataFrame, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None):
     """
     Plota e opcionalmente salva um gráfico de mapa de calor para um DataFrame.
@@ -172,10 +183,12 @@ def plot_heatmap(data: pd.DataFrame, title: str = "", xlabel: str = "", ylabel:
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Heatmap saved at: {full_path}")
 
     plt.show()
 
+@instrument()
 def plot_regression(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None):
     """
     Plota e opcionalmente salva um gráfico de regressão para duas séries de dados.
@@ -203,11 +216,13 @@ def plot_regression(x: pd.Series, y: pd.Series, title: str = "", xlabel: str = "
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Regression plot saved at: {full_path}")
 
     plt.show()
 
 
+@instrument()
 def plot_count(data: pd.DataFrame, column: str, title: str = "", xlabel: str = "", save_path: str = None):
     """
     Plots and optionally saves a count plot for a DataFrame.
@@ -236,12 +251,14 @@ def plot_count(data: pd.DataFrame, column: str, title: str = "", xlabel: str = "
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Count plot saved at: {full_path}")
 
     plt.show()
 
 
 
+@instrument()
 def plot_line(data: pd.Series, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None):
     """
     Plots a line chart for a Series (index on the X-axis, values on the Y-axis).
@@ -279,6 +296,7 @@ def plot_line(data: pd.Series, title: str = "", xlabel: str = "", ylabel: str =
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Line plot saved at: {full_path}")
 
     plt.show()
@@ -324,6 +342,7 @@ def plot_line(data: pd.Series, title: str = "", xlabel: str = "", ylabel: str =
 
  
 
+@instrument()
 def lm_plot(df: pd.DataFrame, x: str, y: str, hue: str = None, title: str = "", save_path: str = None):
     """
     Plots and optionally saves a linear model plot for a DataFrame.
@@ -351,6 +370,7 @@ def lm_plot(df: pd.DataFrame, x: str, y: str, hue: str = None, title: str = "",
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"LM plot saved at: {full_path}")
 
     plt.show()
@@ -358,6 +378,7 @@ def lm_plot(df: pd.DataFrame, x: str, y: str, hue: str = None, title: str = "",
 
 
 
+@instrument()
 def plot_box(df: pd.DataFrame, x: str, y: str, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None, hue: str = None, ylim: tuple = None, xlim: tuple = None):
     """
     Plots and optionally saves a box plot for a DataFrame.
@@ -390,6 +411,7 @@ def plot_box(df: pd.DataFrame, x: str, y: str, title: str = "", xlabel: str = ""
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Box plot saved at: {full_path}")
 
     plt.show()
@@ -399,6 +421,7 @@ def plot_box(df: pd.DataFrame, x: str, y: str, title: str = "", xlabel: str = ""
 
 # Em src/viz.py
 
+@instrument()
 def plot_stacked_bar(data: pd.DataFrame, title: str = "", xlabel: str = "", ylabel: str = "", save_path: str = None):
     """
     Plots and optionally saves a 100% stacked bar chart from a pre-formatted DataFrame.
@@ -442,11 +465,13 @@ def plot_stacked_bar(data: pd.DataFrame, title: str = "", xlabel: str = "", ylab
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Stacked bar plot saved at: {full_path}")
 
     plt.show()
 
 
+@instrument()
 def plot_bubble(data: pd.DataFrame, x_col: str, y_col: str, size_col: str,title: str = "", xlabel: str = "", ylabel: str = "", top_n_labels: int = 10, save_path: str = None):
     """
     Plots a bubble chart, where bubble size indicates a third variable.
@@ -501,12 +526,14 @@ def plot_bubble(data: pd.DataFrame, x_col: str, y_col: str, size_col: str,title:
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Bubble plot saved at: {full_path}")
 
     plt.show()
 
 
 
+@instrument()
 def pie_plot(data: pd.Series, title: str = "", save_path: str = None):
     """
     Plots and optionally saves a pie chart for a Series.
@@ -529,6 +556,7 @@ def pie_plot(data: pd.Series, title: str = "", save_path: str = None):
         OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
         full_path = OUTPUTS_DIR / save_path
         plt.savefig(full_path, dpi=600)
+        record_io(bytes_written=full_path.stat().st_size)
         print(f"Pie chart saved at: {full_path}")
 
     plt.show()
@@ -537,6 +565,7 @@ def pie_plot(data: pd.Series, title: str = "", save_path: str = None):
 
 
 
+@instrument()
 def display_image_grid(file_names: list, figures_path: Path, titles: list = None, cols: int = 3, figure_size=(20, 15)):
     """
     Displays a grid of saved images from a specified path.